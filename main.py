@@ -1,8 +1,11 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from comprehensive_scraper import CyclingStatsScraper
+import asyncio
 import json
 import os
+import threading
 import time
 from typing import Dict, Any
 
@@ -28,6 +31,16 @@ cached_merckx_data = None
 cached_pogacar_data = None
 last_pogacar_fetch_time = 0
 
+# Server-sent events configuration
+UPDATES_HEARTBEAT_INTERVAL = 30
+
+# Update broadcast state: the latest event is encoded once and shared by every subscriber
+update_publish_lock = threading.Lock()
+update_version = 0
+latest_update = None
+update_event_loop = None
+update_event = None
+
 def load_merckx_data():
     """Load Merckx data from cache or scrape if not available"""
     global cached_merckx_data
@@ -54,14 +67,17 @@ def get_pogacar_data():
     if (cached_pogacar_data is None or 
         (current_time - last_pogacar_fetch_time) > POGACAR_CACHE_DURATION):
         
+        fresh_data = None
         try:
             print("Scraping fresh Pogacar data...")
-            cached_pogacar_data = scraper.scrape_complete_rider_data("Tadej Pogacar")
+            scraped_data = scraper.scrape_complete_rider_data("Tadej Pogacar")
+            cached_pogacar_data = scraped_data
             last_pogacar_fetch_time = current_time
             
             # Save to cache file
             with open(POGACAR_CACHE_FILE, "w") as f:
-                json.dump(cached_pogacar_data, f, indent=2)
+                json.dump(scraped_data, f, indent=2)
+            fresh_data = scraped_data
                 
         except Exception as e:
             print(f"Error scraping Pogacar data: {e}")
@@ -72,9 +88,55 @@ def get_pogacar_data():
                     cached_pogacar_data = json.load(f)
             elif cached_pogacar_data is None:
                 raise HTTPException(status_code=500, detail="Failed to load Pogacar data")
+        
+        if fresh_data is not None:
+            publish_pogacar_update(fresh_data, current_time)
     
     return cached_pogacar_data
 
+def encode_update_message(version, pogacar_data, fetch_time):
+    """Build the compact SSE update event for a Pogacar data snapshot"""
+    payload = {
+        "version": version,
+        "updated_at": time.ctime(fetch_time),
+        "pogacar": pogacar_data['career_metrics']
+    }
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"id: {version}\nevent: update\ndata: {data}\n\n".encode("utf-8")
+
+def wake_update_subscribers():
+    """Release every waiting subscriber and arm a fresh event for the next update"""
+    global update_event
+    
+    if update_event is not None:
+        update_event.set()
+    update_event = asyncio.Event()
+
+def publish_pogacar_update(pogacar_data, fetch_time):
+    """Encode the refreshed Pogacar data once and notify all SSE subscribers"""
+    global update_version, latest_update
+    
+    try:
+        with update_publish_lock:
+            # Millisecond fetch times keep event ids unique across restarts
+            update_version = max(update_version + 1, int(fetch_time * 1000))
+            latest_update = (update_version, encode_update_message(update_version, pogacar_data, fetch_time))
+            loop = update_event_loop
+        
+        # Refreshes run in the threadpool, so hand the wake-up to the event loop
+        if loop is not None:
+            loop.call_soon_threadsafe(wake_update_subscribers)
+    except Exception as e:
+        print(f"Error publishing Pogacar update: {e}")
+
+@app.on_event("startup")
+async def setup_update_broadcast():
+    """Capture the event loop used to notify SSE subscribers"""
+    global update_event_loop, update_event
+    
+    update_event_loop = asyncio.get_running_loop()
+    update_event = asyncio.Event()
+
 # Load Merckx data on startup
 print("Initializing data...")
 load_merckx_data()
@@ -209,18 +271,61 @@ def refresh_pogacar_data():
     
     try:
         print("Force refreshing Pogacar data...")
-        cached_pogacar_data = scraper.scrape_complete_rider_data("Tadej Pogacar")
-        last_pogacar_fetch_time = time.time()
+        pogacar_data = scraper.scrape_complete_rider_data("Tadej Pogacar")
+        fetch_time = time.time()
+        cached_pogacar_data = pogacar_data
+        last_pogacar_fetch_time = fetch_time
         
         with open(POGACAR_CACHE_FILE, "w") as f:
-            json.dump(cached_pogacar_data, f, indent=2)
-        
-        return {
-            "message": "Pogacar data refreshed successfully",
-            "updated_at": time.ctime(last_pogacar_fetch_time)
-        }
+            json.dump(pogacar_data, f, indent=2)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error refreshing Pogacar data: {str(e)}")
+    
+    publish_pogacar_update(pogacar_data, fetch_time)
+    
+    return {
+        "message": "Pogacar data refreshed successfully",
+        "updated_at": time.ctime(fetch_time)
+    }
+
+@app.get("/api/updates")
+async def subscribe_updates(request: Request):
+    """Stream refreshed comparison metrics to clients as server-sent events"""
+    last_event_id = request.headers.get("last-event-id")
+    
+    # Reconnecting clients that already hold the latest version get no replay
+    try:
+        sent_version = int(last_event_id) if last_event_id else None
+    except ValueError:
+        sent_version = None
+    
+    async def event_stream():
+        nonlocal sent_version
+        
+        while True:
+            # Grab the event before checking for data so a publish in between still wakes us
+            waiter = update_event
+            current = latest_update
+            if current is not None and sent_version != current[0]:
+                sent_version, message = current
+                yield message
+                continue
+            
+            if waiter is None:
+                await asyncio.sleep(UPDATES_HEARTBEAT_INTERVAL)
+                yield b": keep-alive\n\n"
+                continue
+            
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout=UPDATES_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/health")
 def health_check():
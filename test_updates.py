@@ -0,0 +1,114 @@
+import asyncio
+import importlib
+import json
+import sys
+import time
+
+import pytest
+from starlette.requests import Request
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """Import main against a temporary cache directory so no scraping happens"""
+    monkeypatch.chdir(tmp_path)
+    with open(tmp_path / "merckx_complete_data.json", "w") as f:
+        json.dump({"career_metrics": {"races_won": 525}}, f)
+
+    sys.modules.pop("main", None)
+    module = importlib.import_module("main")
+    yield module
+    sys.modules.pop("main", None)
+
+
+def make_request(last_event_id=None):
+    headers = []
+    if last_event_id is not None:
+        headers.append((b"last-event-id", last_event_id.encode("latin-1")))
+    return Request({"type": "http", "method": "GET", "path": "/api/updates", "headers": headers})
+
+
+def parse_event(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode("utf-8").strip().split("\n"))
+    return fields["id"], json.loads(fields["data"])
+
+
+async def subscribe(app_module, last_event_id=None):
+    response = await app_module.subscribe_updates(make_request(last_event_id))
+    return response.body_iterator
+
+
+async def publish(app_module, races_won):
+    # Refreshes run in the threadpool, so publish from a worker thread as well
+    data = {"career_metrics": {"races_won": races_won}}
+    await asyncio.to_thread(app_module.publish_pogacar_update, data, time.time())
+
+
+def test_subscriber_receives_published_update(app_module):
+    async def scenario():
+        await app_module.setup_update_broadcast()
+        stream = await subscribe(app_module)
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+
+        await publish(app_module, 108)
+        event_id, payload = parse_event(await asyncio.wait_for(pending, 1))
+        assert event_id == str(app_module.update_version)
+        assert payload["version"] == app_module.update_version
+        assert payload["pogacar"] == {"races_won": 108}
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_update_published_between_reads_is_not_missed(app_module):
+    async def scenario():
+        await app_module.setup_update_broadcast()
+        stream = await subscribe(app_module)
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        await publish(app_module, 108)
+        await asyncio.wait_for(pending, 1)
+
+        # The subscriber is suspended at its yield while the next refresh lands
+        await publish(app_module, 109)
+        _, payload = parse_event(await asyncio.wait_for(stream.__anext__(), 1))
+        assert payload["pogacar"] == {"races_won": 109}
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_matching_last_event_id_suppresses_replay(app_module):
+    async def scenario():
+        await app_module.setup_update_broadcast()
+        await publish(app_module, 108)
+        stream = await subscribe(app_module, str(app_module.update_version))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(stream.__anext__(), 0.2)
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_invalid_last_event_id_replays_latest_update(app_module):
+    async def scenario():
+        await app_module.setup_update_broadcast()
+        await publish(app_module, 108)
+        stream = await subscribe(app_module, "²")
+        event_id, _ = parse_event(await asyncio.wait_for(stream.__anext__(), 1))
+        assert event_id == str(app_module.update_version)
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_versions_stay_unique_across_restarts(app_module):
+    # A previous process could only have handed out ids below the current time in ms
+    before = int(time.time() * 1000)
+    app_module.publish_pogacar_update({"career_metrics": {}}, time.time())
+    first = app_module.update_version
+    app_module.publish_pogacar_update({"career_metrics": {}}, time.time())
+    assert first >= before
+    assert app_module.update_version > first